@@ -3,16 +3,18 @@
 from pypeline_functions.utils.google_cloud_storage import GoogleCloudStorage
 
 
-def extract_google_takeout_seed(landing_bucket_name: str, landing_prefix: str) -> None:
+def extract_google_takeout_seed(landing_bucket_name: str, landing_prefix: str, concurrency: int = 32) -> None:
     """Run the extraction pipeline for the Google Takeout data seed."""
     gcs = GoogleCloudStorage()
 
     prefix_filter = "google/takeout"
 
     if landing_prefix == "":
-        blob_paths = gcs.extract_zip_files("data-seeds", prefix_filter, landing_bucket_name)
+        blob_paths = gcs.extract_zip_files("data-seeds", prefix_filter, landing_bucket_name, workers=concurrency)
     else:
-        blob_paths = gcs.extract_zip_files("data-seeds", prefix_filter, landing_bucket_name, landing_prefix)
+        blob_paths = gcs.extract_zip_files(
+            "data-seeds", prefix_filter, landing_bucket_name, landing_prefix, workers=concurrency
+        )
 
     print(blob_paths)
 
@@ -34,10 +36,16 @@ def main() -> None:  # noqa: D103
         help="prefix path location where the extract will be stored. \
             if undeclared it will use the same prefix path as the source",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=32,
+        help="maximum number of .zip files that are extracted concurrently",
+    )
 
     args = parser.parse_args()
 
-    extract_google_takeout_seed(args.landing_bucket_name, args.landing_prefix)
+    extract_google_takeout_seed(args.landing_bucket_name, args.landing_prefix, args.concurrency)
 
 
 if __name__ == "__main__":
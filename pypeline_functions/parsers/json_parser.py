@@ -1,5 +1,18 @@
 from datetime import UTC, datetime
 
+# fields of the track, album and artist entries in the Spotify Music Library data
+_TRACK_KEYS = ("artist", "album", "track", "uri")
+_ALBUM_KEYS = ("artist", "album", "uri")
+_ARTIST_KEYS = ("name", "uri")
+
+
+def _parse_iso_datetime(string: str) -> datetime:
+    """Parse an ISO 8601 timestamp into a naive datetime, dropping the trailing UTC designator if present.
+
+    `datetime.fromisoformat` is implemented in C and avoids the regex matching done by `datetime.strptime`.
+    """
+    return datetime.fromisoformat(string.removesuffix("Z"))
+
 
 class GoogleTakeoutParser:
     """Namespace for all the JSON parser functions for the Google Takeout data.
@@ -25,16 +38,15 @@ class GoogleTakeoutParser:
         dct : dict
             A dictionary representing a single entry of the Google Chrome History data.
         """
-        dct["title"] = dct.get("title", "")
-        dct["page_transition"] = dct.get("page_transition", "")
-        if isinstance(dct.get("ptoken", {}), dict) and len(dct.get("ptoken", {}) == 0):
-            dct["ptoken"] = None
-        else:
-            # might be an unnecessary statement but leaving it in to be safe
-            dct["ptoken"] = dct.get("ptoken", None)
+        get = dct.get
+        dct["title"] = get("title", "")
+        dct["page_transition"] = get("page_transition", "")
+        # an empty ptoken is stored as None
+        dct["ptoken"] = get("ptoken") or None
         # TODO: add HTTP sanitation by converting to HTTPS
-        dct["url"] = dct.get("url", "")
-        dct["time_usec"] = datetime.fromtimestamp(dct.get("time_usec", 0) / 10**6, UTC)
+        dct["url"] = get("url", "")
+        dct["time_usec"] = datetime.fromtimestamp(get("time_usec", 0) / 10**6, UTC)
+        return dct
 
     def activity_parser(self, dct: dict) -> dict:
         """
@@ -45,29 +57,21 @@ class GoogleTakeoutParser:
         dct : dict
             A dictionary representing a single entry of the Google Activity data.
         """
-        datetime_format = "%Y-%m-%dT%H:%M:%S.%fZ"
-        dct["header"] = dct.get("header")
-        dct["title"] = dct.get("title")
-        for datetime_format in ["%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"]:
-            try:
-                dct["time"] = datetime.strptime(dct.get("title", "1970-01-01:00:00:00Z"), datetime_format)  # noqa: DTZ007
-                break
-            except ValueError:
-                pass
-        dct["description"] = dct.get("description")
-        dct["titleUrl"] = dct.get("titleUrl")
-        subtitles = dct.get("subtitles", [])
-        _subtitles = []
-        for subtitle in subtitles:
-            _subtitles.append({"name": subtitle.get("name", ""), "url": subtitle.get("url", None)})
-        dct["subtitles"] = _subtitles
-        details = dct.get("details", [])
-        _details = []
-        for detail in details:
-            _details.append({"name": detail.get("name", "")})
-        dct["details"] = _details
-        dct["products"] = dct.get("products")
-        dct["activityControls"] = dct.get("activityControls")
+        get = dct.get
+        dct["header"] = get("header")
+        dct["title"] = get("title")
+        try:
+            dct["time"] = _parse_iso_datetime(get("time", "1970-01-01T00:00:00Z"))
+        except ValueError:
+            pass
+        dct["description"] = get("description")
+        dct["titleUrl"] = get("titleUrl")
+        dct["subtitles"] = [
+            {"name": subtitle.get("name", ""), "url": subtitle.get("url", None)} for subtitle in get("subtitles", [])
+        ]
+        dct["details"] = [{"name": detail.get("name", "")} for detail in get("details", [])]
+        dct["products"] = get("products")
+        dct["activityControls"] = get("activityControls")
         return dct
 
     def _candidate_location_parser(self, dct: dict) -> dict:
@@ -81,8 +85,8 @@ class GoogleTakeoutParser:
         """
         output = {}
 
-        output["lat"] = dct["centerLatE7"]
-        output["lng"] = dct["centerLngE7"]
+        output["lat"] = dct["latitudeE7"]
+        output["lng"] = dct["longitudeE7"]
         output["place_id"] = dct["placeId"]
         output["semantic_type"] = dct.get("semanticType", None)
         output["address"] = dct.get("address", None)
@@ -101,41 +105,37 @@ class GoogleTakeoutParser:
             A dictionary representing a single entry of the Semantic Location History data.
         """
         output = {}
-        datetime_format = "%Y-%m-%dT%H:%M:%SZ"
 
         place_visit = dct["placeVisit"]
+        visit_get = place_visit.get
         location = place_visit["location"]
+        location_get = location.get
         duration = place_visit["duration"]
-        output["lat"] = location.latitudeE7
-        output["lng"] = location.longitudeE7
-        output["place_id"] = location.placeId
-        output["location_confidence"] = location.locationConfidence
-        output["address"] = location.get("address", None)
-        output["name"] = location.get("name", None)
-        output["calibrated_probability"] = location.get("calibratedProbability", None)
-        output["device_tag"] = location.get("sourceInfo", {"deviceTag": None}).deviceTag
-        if duration.startTimestamp is None:
-            output["start_time"] = None
-        else:
-            output["start_time"] = datetime.strptime(duration.startTimestamp, datetime_format)  # noqa: DTZ007
-        if duration.endTimestamp is None:
-            output["end_time"] = None
-        else:
-            output["end_time"] = datetime.strptime(duration.endTimestamp, datetime_format)  # noqa: DTZ007
-        output["center_lat"] = dct.get("centerLatE7", None)
-        output["center_lng"] = dct.get("centerLngE7", None)
-        output["place_confidence"] = dct.get("placeConfidence", None)
-        output["place_visit_type"] = dct.get("placeVisitType", None)
-        output["visit_confidence"] = dct.get("visitConfidence", None)
-        output["edit_confirmation_status"] = dct.get("editConfirmationStatus", None)
-        output["place_visit_importance"] = dct.get("placeVisitImportance", None)
-
-        parsed_locations = []
-        candidate_locations = dct.get("otherCandidateLocations", [])
-        for candidate_location in candidate_locations:
-            loc_parsed = self._candidate_location_parser(candidate_location)
-            parsed_locations.append(loc_parsed)
-        output["candidate_locations"] = parsed_locations
+        output["lat"] = location["latitudeE7"]
+        output["lng"] = location["longitudeE7"]
+        output["place_id"] = location["placeId"]
+        output["location_confidence"] = location["locationConfidence"]
+        output["address"] = location_get("address", None)
+        output["name"] = location_get("name", None)
+        output["calibrated_probability"] = location_get("calibratedProbability", None)
+        output["device_tag"] = location_get("sourceInfo", {}).get("deviceTag", None)
+        start_timestamp = duration.get("startTimestamp")
+        output["start_time"] = None if start_timestamp is None else _parse_iso_datetime(start_timestamp)
+        end_timestamp = duration.get("endTimestamp")
+        output["end_time"] = None if end_timestamp is None else _parse_iso_datetime(end_timestamp)
+        output["center_lat"] = visit_get("centerLatE7", None)
+        output["center_lng"] = visit_get("centerLngE7", None)
+        output["place_confidence"] = visit_get("placeConfidence", None)
+        output["place_visit_type"] = visit_get("placeVisitType", None)
+        output["visit_confidence"] = visit_get("visitConfidence", None)
+        output["edit_confirmation_status"] = visit_get("editConfirmationStatus", None)
+        output["place_visit_importance"] = visit_get("placeVisitImportance", None)
+
+        candidate_location_parser = self._candidate_location_parser
+        output["candidate_locations"] = [
+            candidate_location_parser(candidate_location)
+            for candidate_location in visit_get("otherCandidateLocations", [])
+        ]
 
         return output
 
@@ -156,12 +156,6 @@ class SpotifyParser:
         Parse and format a single entry of the Search Query data.
     user_data_parser(dct:dict) -> dict
         Parse and format the User data.
-    _track_parser(dct:dict) -> dict
-        Parse and format a single entry of track data.
-    _album_parser(dct:dict) -> dict
-        Parse and format a single entry of album data.
-    _artist_parser(dct:dict) -> dict
-        Parse and format a single entry of artist data.
     library_parser(dct:dict) -> dict
         Parse and format a single entry of Music Library data.
     streaming_history_parser(dct:dict) -> dict
@@ -230,7 +224,7 @@ class SpotifyParser:
 
         output["platform"] = dct["platform"]
         if dct["searchTime"] is not None:
-            output["search_time"] = datetime.strptime(dct["searchTime"][:19], "%Y-%m-%dT%H:%M:%S")  # noqa: DTZ007
+            output["search_time"] = _parse_iso_datetime(dct["searchTime"][:19])
         else:
             output["search_time"] = None
         output["search_query"] = dct["searchQuery"]
@@ -257,7 +251,7 @@ class SpotifyParser:
         output["country"] = dct["country"]
         output["created_from_facebook"] = dct["createdFromFacebook"]
         output["facebook_UID"] = dct.get("facebookUid", None)
-        output["birthdate"] = datetime.strptime(dct["birthdate"][:10], "%Y-%m-%d")  # noqa: DTZ007
+        output["birthdate"] = _parse_iso_datetime(dct["birthdate"][:10])
         output["gender"] = dct["gender"]
         output["postal_code"] = dct.get("postalCode", None)
         output["mobile_number"] = dct.get("mobileNumber", None)
@@ -267,57 +261,6 @@ class SpotifyParser:
 
         return output
 
-    def _track_parser(self, dct: dict) -> dict:
-        """
-        Parse and format a single entry of track data.
-
-        Parameters
-        ----------
-        dct : dict
-            A dictionary representing a single entry of track data.
-        """
-        output = {}
-
-        output["artist"] = dct.get("artist", "")
-        output["album"] = dct.get("album", "")
-        output["track"] = dct.get("track", "")
-        output["uri"] = dct.get("uri", "")
-
-        return output
-
-    def _album_parser(self, dct: dict) -> dict:
-        """
-        Parse and format a single entry of album data.
-
-        Parameters
-        ----------
-        dct : dict
-            A dictionary representing a single entry of album data.
-        """
-        output = {}
-
-        output["artist"] = dct.get("artist", "")
-        output["album"] = dct.get("album", "")
-        output["uri"] = dct.get("uri", "")
-
-        return output
-
-    def _artist_parser(self, dct: dict) -> dict:
-        """
-        Parse and format a single entry of artist data.
-
-        Parameters
-        ----------
-        dct : dict
-            A dictionary representing a single entry of artist data.
-        """
-        output = {}
-
-        output["name"] = dct.get("name", "")
-        output["uri"] = dct.get("uri", "")
-
-        return output
-
     def library_parser(self, dct: dict) -> dict:
         """
         Parse and format a single entry of Music Library data.
@@ -329,19 +272,22 @@ class SpotifyParser:
         """
         output = {}
 
-        output["tracks"] = [self._track_parser(datum) for datum in dct.get("tracks", [])]
-        output["albums"] = [self._album_parser(datum) for datum in dct.get("albums", [])]
+        banned_tracks = dct.get("bannedTracks")
+        banned_artists = dct.get("bannedArtists")
+
+        output["tracks"] = [{key: datum.get(key, "") for key in _TRACK_KEYS} for datum in dct.get("tracks", ())]
+        output["albums"] = [{key: datum.get(key, "") for key in _ALBUM_KEYS} for datum in dct.get("albums", ())]
         output["shows"] = dct.get("shows", None)
         output["episodes"] = dct.get("episodes", None)
-        if (len(dct["bannedTracks"]) == 0) | (dct["bannedTracks"] is None):
+        if banned_tracks:
+            output["banned_tracks"] = [{key: datum.get(key, "") for key in _TRACK_KEYS} for datum in banned_tracks]
+        else:
             output["banned_tracks"] = None
+        output["artists"] = [{key: datum.get(key, "") for key in _ARTIST_KEYS} for datum in dct.get("artists", ())]
+        if banned_artists:
+            output["banned_artists"] = [{key: datum.get(key, "") for key in _ARTIST_KEYS} for datum in banned_artists]
         else:
-            output["banned_tracks"] = [self._track_parser(datum) for datum in dct.get("bannedTracks", [])]
-        output["artists"] = [self._artist_parser(datum) for datum in dct.get("artists", [])]
-        if (len(dct["bannedArtists"]) == 0) | (dct["bannedArtists"] is None):
             output["banned_artists"] = None
-        else:
-            output["banned_artists"] = [self._artist_parser(datum) for datum in dct.get("bannedArtists", [])]
         output["other"] = dct.get("other", None)
 
         return output
@@ -357,7 +303,7 @@ class SpotifyParser:
         """
         output = {}
 
-        output["ts"] = datetime.strptime(dct["ts"], "%Y-%m-%dT%H:%M:%SZ")  # noqa: DTZ007
+        output["ts"] = _parse_iso_datetime(dct["ts"])
         output["username"] = dct.get("username", "")
         output["platform"] = dct.get("platform", "")
         output["ms_played"] = dct.get("ms_played", None)
@@ -376,10 +322,11 @@ class SpotifyParser:
         output["shuffle"] = dct.get("shuffle", None)
         output["skipped"] = dct.get("skipped", None)
         output["offline"] = dct.get("offline", None)
-        if dct["offline_timestamp"] == 0 | dct["offline_timestamp"] is None:
+        offline_timestamp = dct.get("offline_timestamp")
+        if not offline_timestamp:
             output["offline_timestamp"] = None
         else:
-            output["offline_timestamp"] = datetime.fromtimestamp(dct.get("offline_timestamp", 0) / 10**6, UTC)
+            output["offline_timestamp"] = datetime.fromtimestamp(offline_timestamp / 10**6, UTC)
         output["incognito_mode"] = dct.get("incognito_mode", None)
 
         return output
@@ -1,7 +1,8 @@
-import json
 from collections.abc import Iterable, Sequence
 
 import dlt
+import ijson
+import orjson
 from dlt.sources import DltResource
 
 from pypeline_functions.models.google_takeout import Activity, ChromeHistory, PlaceVisit
@@ -21,6 +22,7 @@ def google_takeout_seed(bucket_name: str) -> Sequence[DltResource]:
     """
     DATA_PATH = "google/takeout/"  # noqa: N806
     DATETIME_FORMAT = "%Y%m%dT%H%M%SZ"  # noqa: N806
+    BATCH_SIZE = 10_000  # noqa: N806
     gcs = GoogleCloudStorage()
     gt = GoogleTakeoutParser()
 
@@ -31,8 +33,7 @@ def google_takeout_seed(bucket_name: str) -> Sequence[DltResource]:
         """Extract the latest chrome history data."""
         latest_seeds = gcs.get_latest_seeds(bucket_name, DATA_PATH, "Chrome/History.json", DATETIME_FORMAT)
         for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
+            data = orjson.loads(seed.download_as_bytes())
             data = [gt.chrome_history_parser(datum) for datum in data.get("BrowserHistory", [])]
             yield data
 
@@ -40,9 +41,8 @@ def google_takeout_seed(bucket_name: str) -> Sequence[DltResource]:
     def activity() -> Iterable[Activity]:
         """Extract the latest activity data."""
         latest_seeds = gcs.get_latest_seeds(bucket_name, DATA_PATH, "MyActivity.json", DATETIME_FORMAT)
-        for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
+        for content in gcs.download_many_as_bytes(latest_seeds):
+            data = orjson.loads(content)
             data = [gt.activity_parser(datum) for datum in data]
             yield data
 
@@ -52,12 +52,19 @@ def google_takeout_seed(bucket_name: str) -> Sequence[DltResource]:
     def location() -> Iterable[PlaceVisit]:
         """Extract the latest location data."""
         latest_seeds = gcs.get_latest_seeds(
-            bucket_name, DATA_PATH, "Location History (Timeline)/Records.json", DATETIME_FORMAT
+            bucket_name, DATA_PATH, "Semantic Location History/*/*.json", DATETIME_FORMAT
         )
         for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
-            data = [gt.location_parser(datum) for datum in data if "placeVisit" in data]
-            yield data
+            # stream only the place visits instead of loading the whole timeline so that memory stays bounded by the
+            # batch size
+            with seed.open("rb") as fh:
+                batch = []
+                for place_visit in ijson.items(fh, "timelineObjects.item.placeVisit", use_float=True):
+                    batch.append(gt.location_parser({"placeVisit": place_visit}))
+                    if len(batch) >= BATCH_SIZE:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
 
     return chrome_history, activity, location
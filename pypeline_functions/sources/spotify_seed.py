@@ -1,7 +1,8 @@
-import json
 from collections.abc import Iterable, Sequence
 
 import dlt
+import ijson
+import orjson
 from dlt.sources import DltResource
 
 from pypeline_functions.models.spotify import (
@@ -30,6 +31,7 @@ def spotify_seed(bucket_name: str) -> Sequence[DltResource]:
     ACCOUNT_DATA_PATH = "spotify/account_data/"  # noqa: N806
     STREAMING_HISTORY_PATH = "spotify/streaming_history"  # noqa: N806
     DATETIME_FORMAT = "%Y%m%dT%H%M%S"  # noqa: N806
+    BATCH_SIZE = 10_000  # noqa: N806
     gcs = GoogleCloudStorage()
     spotify = SpotifyParser()
 
@@ -38,8 +40,7 @@ def spotify_seed(bucket_name: str) -> Sequence[DltResource]:
         """Extract the latest follow data."""
         latest_seeds = gcs.get_latest_seeds(bucket_name, ACCOUNT_DATA_PATH, "Follow.json", DATETIME_FORMAT)
         for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
+            data = orjson.loads(seed.download_as_bytes())
             data = spotify.follow_data_parser(data)
             yield data
 
@@ -48,8 +49,7 @@ def spotify_seed(bucket_name: str) -> Sequence[DltResource]:
         """Extract the latest identifier data."""
         latest_seeds = gcs.get_latest_seeds(bucket_name, ACCOUNT_DATA_PATH, "Identifiers.json", DATETIME_FORMAT)
         for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
+            data = orjson.loads(seed.download_as_bytes())
             data = spotify.identifier_parser(data)
             yield data
 
@@ -58,8 +58,7 @@ def spotify_seed(bucket_name: str) -> Sequence[DltResource]:
         """Extract the latest marquee data."""
         latest_seeds = gcs.get_latest_seeds(bucket_name, ACCOUNT_DATA_PATH, "Marquee.json", DATETIME_FORMAT)
         for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
+            data = orjson.loads(seed.download_as_bytes())
             data = [spotify.marquee_parser(datum) for datum in data]
             yield data
 
@@ -73,8 +72,7 @@ def spotify_seed(bucket_name: str) -> Sequence[DltResource]:
         """Extract the latest search query data."""
         latest_seeds = gcs.get_latest_seeds(bucket_name, ACCOUNT_DATA_PATH, "SearchQueries.json", DATETIME_FORMAT)
         for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
+            data = orjson.loads(seed.download_as_bytes())
             data = [spotify.search_query_parser(datum) for datum in data]
             yield data
 
@@ -83,8 +81,7 @@ def spotify_seed(bucket_name: str) -> Sequence[DltResource]:
         """Extract the latest user data."""
         latest_seeds = gcs.get_latest_seeds(bucket_name, ACCOUNT_DATA_PATH, "Userdata.json", DATETIME_FORMAT)
         for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
+            data = orjson.loads(seed.download_as_bytes())
             data = spotify.user_data_parser(data)
             yield data
 
@@ -93,20 +90,26 @@ def spotify_seed(bucket_name: str) -> Sequence[DltResource]:
         """Extract the latest library data."""
         latest_seeds = gcs.get_latest_seeds(bucket_name, ACCOUNT_DATA_PATH, "YourLibrary.json", DATETIME_FORMAT)
         for seed in latest_seeds:
-            content = seed.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
+            data = orjson.loads(seed.download_as_bytes())
             data = spotify.library_parser(data)
             yield data
 
     @dlt.resource(name="audio_streaming_history", write_disposition="merge", primary_key="ts", columns=StreamingHistory)
     def audio_streaming_history() -> Iterable[StreamingHistory]:
         """Extract the latest audio streaming history data."""
-        blobs = gcs.list_blobs_with_prefix(bucket_name=bucket_name, prefix=STREAMING_HISTORY_PATH)
-        streaming_history_files = [blob for blob in blobs if blob.name.endswith(".json") and "Audio" in blob.name]
+        streaming_history_files = gcs.list_blobs_with_prefix(
+            bucket_name=bucket_name, prefix=STREAMING_HISTORY_PATH, match_glob=f"{STREAMING_HISTORY_PATH}**Audio**.json"
+        )
         for f in streaming_history_files:
-            content = f.download_as_string().decode("utf-8", "replace")
-            data = json.loads(content)
-            data = [spotify.streaming_history_parser(datum) for datum in data]
-            yield data
+            # stream the records instead of loading the whole file so that memory stays bounded by the batch size
+            with f.open("rb") as fh:
+                batch = []
+                for datum in ijson.items(fh, "item", use_float=True):
+                    batch.append(spotify.streaming_history_parser(datum))
+                    if len(batch) >= BATCH_SIZE:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
 
     return follow_data, identifier, marquee, user_data, library, search_query, audio_streaming_history
@@ -7,12 +7,27 @@ This module provides:
 import io
 import json
 import logging
-import re
+import os
+from collections import deque
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import ClassVar
 from zipfile import ZipFile, is_zipfile
 
+import orjson
+from google.api_core.exceptions import GoogleAPIError
 from google.cloud.storage import Blob, Client, transfer_manager
+from google.cloud.storage.retry import DEFAULT_RETRY
+
+# files up to this size (in bytes) are uploaded in a single request instead of a resumable session
+SINGLE_REQUEST_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+# files above this size (in bytes) are uploaded as concurrent chunks instead of a single stream
+PARALLEL_UPLOAD_THRESHOLD = 150 * 1024 * 1024
+# size (in bytes) of each chunk sent in a resumable upload session
+RESUMABLE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# maximum number of calls sent in a single batch request
+DELETE_BATCH_SIZE = 100
 
 
 # TODO: add logging to all functions
@@ -40,14 +55,37 @@ class GoogleCloudStorage:
         Delete files inside the specified blob directory in the GCS bucket.
     """
 
+    # shared by every instance so that all sources reuse one authenticated session and its connection pool
+    _client: ClassVar[Client | None] = None
+
     def __init__(self) -> None:
-        self.client = Client()
+        if GoogleCloudStorage._client is None:
+            GoogleCloudStorage._client = Client()
+        self.client = GoogleCloudStorage._client
+        # subfolder listings keyed by (bucket_name, prefix), kept until a write to the bucket through this instance
+        self._subfolder_cache: dict[tuple[str, str], frozenset[str]] = {}
+
+    def _invalidate_subfolder_cache(self, bucket_name: str) -> None:
+        """Drop the cached subfolder listings of a bucket after it has been written to."""
+        self._subfolder_cache = {key: value for key, value in self._subfolder_cache.items() if key[0] != bucket_name}
 
     # ----------------------------------- Upload -----------------------------------
     # inspiration: https://cloud.google.com/storage/docs/uploading-objects
-    def upload(self, source_file: str, bucket_name: str, file_path: str) -> bool:
+    def upload(
+        self,
+        source_file: str,
+        bucket_name: str,
+        file_path: str,
+        workers: int = 8,
+        chunk_size: int = 32 * 1024 * 1024,
+    ) -> bool:
         """Upload a single file to Google Cloud Storage at the specified destination.
 
+        Files up to `SINGLE_REQUEST_UPLOAD_THRESHOLD` are sent in a single request, files up to
+        `PARALLEL_UPLOAD_THRESHOLD` are sent through a resumable upload session in chunks of
+        `RESUMABLE_UPLOAD_CHUNK_SIZE` and larger files are split into chunks that are uploaded concurrently
+        (XML API multipart upload).
+
         Parameters
         ----------
         source_file : str
@@ -56,15 +94,28 @@ class GoogleCloudStorage:
             The name of the bucket that the file will be uploaded in.
         file_path : str
             The file path where the `source_file` will be stored in the specified bucket.
+        workers : int, optional
+            The maximum number of concurrent chunk uploads for large files.
+        chunk_size : int, optional
+            The size in bytes of each chunk for large files.
         """
+        self._invalidate_subfolder_cache(bucket_name)
         bucket = self.client.bucket(bucket_name)
         blob = bucket.blob(file_path)
-        blob.upload_from_filename(source_file)
+
+        file_size = os.path.getsize(source_file)
+        if file_size > PARALLEL_UPLOAD_THRESHOLD:
+            transfer_manager.upload_chunks_concurrently(source_file, blob, chunk_size=chunk_size, max_workers=workers)
+        else:
+            if file_size > SINGLE_REQUEST_UPLOAD_THRESHOLD:
+                blob.chunk_size = RESUMABLE_UPLOAD_CHUNK_SIZE
+            blob.upload_from_filename(source_file, checksum="crc32c")
 
     def upload_many_blobs_with_transfer_manager(
         self, bucket_name: str, filenames: list[str], source_directory: str = "", workers: int = 8
     ) -> None:
         """Upload every file in a list to a bucket, concurrently in a process pool."""
+        self._invalidate_subfolder_cache(bucket_name)
         bucket = self.client.bucket(bucket_name)
 
         results = transfer_manager.upload_many_from_filenames(
@@ -84,6 +135,7 @@ class GoogleCloudStorage:
         """Upload every file in a directory, including all files in subdirectories."""
         from pathlib import Path
 
+        self._invalidate_subfolder_cache(bucket_name)
         bucket = self.client.bucket(bucket_name)
 
         # recursively get all files in `directory` as Path objects.
@@ -102,9 +154,13 @@ class GoogleCloudStorage:
         # TODO: plan how to do logging
         # print("Found {} files.".format(len(string_paths)))
 
-        # Start the upload.
+        # Start the upload. The uploads are network-bound, so threads avoid spawning and pickling into worker processes.
         results = transfer_manager.upload_many_from_filenames(
-            bucket, string_paths, source_directory=source_directory, max_workers=workers
+            bucket,
+            string_paths,
+            source_directory=source_directory,
+            max_workers=workers,
+            worker_type=transfer_manager.THREAD,
         )
 
         for name, result in zip(string_paths, results, strict=False):
@@ -112,7 +168,7 @@ class GoogleCloudStorage:
 
             if isinstance(result, Exception):
                 logging.error(f"Failed to upload {name} due to exception: {result}")
-                raise ExceptionGroup("File upload failed", result)
+                raise ExceptionGroup("File upload failed", [result])
             else:
                 logging.info(f"Uploaded {name} to {bucket.name}.")
 
@@ -128,6 +184,7 @@ class GoogleCloudStorage:
         blob_name : str
             The name of the blob to search.
         """
+        self._invalidate_subfolder_cache(bucket_name)
         bucket = self.client.bucket(bucket_name)
         blob = bucket.blob(blob_name)
 
@@ -145,13 +202,14 @@ class GoogleCloudStorage:
             The path prefix of the object to be deleted.
             If left unspecified the entire bucket's content will be deleted.
         """
+        self._invalidate_subfolder_cache(bucket_name)
         blobs_to_delete = self.list_blobs_with_prefix(bucket_name, prefix)
-        with self.client.batch():
-            for blob in blobs_to_delete:
-                blob.delete()
-                logging.info(f"Deleted blob: {blob.name}")
-            logging.info("Files inside the specified GCS blob directory have been deleted successfully.")
-            return True
+        bucket = self.client.bucket(bucket_name)
+        for i in range(0, len(blobs_to_delete), DELETE_BATCH_SIZE):
+            with self.client.batch():
+                bucket.delete_blobs(blobs_to_delete[i : i + DELETE_BATCH_SIZE])
+        logging.info(f"Deleted {len(blobs_to_delete)} blobs inside the specified GCS blob directory.")
+        return True
 
     # ----------------------------------- List -----------------------------------
 
@@ -167,11 +225,10 @@ class GoogleCloudStorage:
             blobs = self.client.list_blobs(bucket_name)
             return blobs
 
-        # TODO: Improve exception handling.
-        except Exception as e:
-            logging.error(f"An error occurred while listing blobs: {e}")
+        except GoogleAPIError:
+            logging.exception("An error occurred while listing blobs")
 
-    def list_blobs_with_prefix(self, bucket_name: str, prefix: str) -> Iterator:
+    def list_blobs_with_prefix(self, bucket_name: str, prefix: str, match_glob: str | None = None) -> Iterator:
         """List all the blobs in the bucket that begin with the prefix.
 
         Parameters
@@ -180,9 +237,11 @@ class GoogleCloudStorage:
             The name of the bucket whose content will be listed.
         prefix_filter : str
             The path prefix to filter the content that will be listed.
+        match_glob : str, optional
+            A glob pattern that the full blob name must match. The filtering is done server-side.
         """
         # Note: Client.list_blobs requires at least package version 1.17.0.
-        blobs = list(self.client.list_blobs(bucket_name, prefix=prefix))
+        blobs = list(self.client.list_blobs(bucket_name, prefix=prefix, match_glob=match_glob))
 
         return blobs
 
@@ -190,6 +249,8 @@ class GoogleCloudStorage:
     def list_subfolders(self, bucket_name: str, prefix: str) -> Iterator:
         """List all the subfolders in the bucket that begin with the prefix.
 
+        The listing is cached per bucket and prefix until the bucket is written to through this instance.
+
         Parameters
         ----------
         bucket_name : str
@@ -197,51 +258,72 @@ class GoogleCloudStorage:
         prefix_filter : str
             The path prefix to filter the content that will be listed.
         """
-        iterator = self.client.list_blobs(bucket_name, prefix=prefix, delimiter="/")
-        prefixes = set()
-        for page in iterator.pages:
-            prefixes.update(page.prefixes)
-        return prefixes
+        key = (bucket_name, prefix)
+        if key not in self._subfolder_cache:
+            iterator = self.client.list_blobs(bucket_name, prefix=prefix, delimiter="/")
+            prefixes = set()
+            for page in iterator.pages:
+                prefixes.update(page.prefixes)
+            self._subfolder_cache[key] = frozenset(prefixes)
+        return self._subfolder_cache[key]
 
     # ----------------------------------- Misc. -----------------------------------
 
     def extract_zip_files(
-        self, bucket_name: str, prefix_filter: str, landing_bucket_name: str, landing_prefix: str | None = None
+        self,
+        bucket_name: str,
+        prefix_filter: str,
+        landing_bucket_name: str,
+        landing_prefix: str | None = None,
+        workers: int = 32,
     ) -> list[str]:
         """Extract all the .zip files from a bucket that begin with the prefix and save them to another bucket.
 
+        The `.zip` files are downloaded, extracted and uploaded concurrently in a thread pool.
+
         Parameters
         ----------
         bucket_name : str
             The name of the bucket that the file will be uploaded in.
         prefix_filter : str
             The path prefix of the `.zip` files to be extracted.
+        landing_bucket_name : str
+            The name of the bucket where the extracted files will be stored.
+        landing_prefix : str, optional
+            The path prefix where the extracted files will be stored.
+            If left unspecified the path of the `.zip` file will be used.
+        workers : int, optional
+            The maximum number of `.zip` files that are processed concurrently.
         """
-        bucket = self.client.get_bucket(bucket_name)
-
         landing_bucket = self.client.get_bucket(landing_bucket_name)
-
-        blobs = self.list_blobs_with_prefix(bucket_name, prefix_filter)
-        blob_paths = [blob.name for blob in blobs]
-
-        # NOTE: we can't use batching because the payload must be less than 10MB (https://cloud.google.com/storage/docs/batch#overview)
-        for blob_path in blob_paths:
-            blob = bucket.blob(blob_path)
-            zipbytes = io.BytesIO(blob.download_as_string())
-
-            if is_zipfile(zipbytes):
-                with ZipFile(zipbytes, "r") as myzip:
-                    for contentfilename in myzip.namelist():
-                        contentfile = myzip.read(contentfilename)
+        self._invalidate_subfolder_cache(landing_bucket_name)
+
+        blobs = self.list_blobs_with_prefix(bucket_name, prefix_filter, match_glob=f"{prefix_filter}**.zip")
+
+        def extract(blob: Blob) -> None:
+            # the blob reader is seekable, so the archive and its members are streamed instead of held in memory
+            with blob.open("rb") as zipstream:
+                if not is_zipfile(zipstream):
+                    return
+                zipstream.seek(0)
+                with ZipFile(zipstream, "r") as myzip:
+                    for contentinfo in myzip.infolist():
+                        contentfilename = contentinfo.filename
                         if landing_prefix:
-                            blob_destination = f"{landing_prefix.removesuffix("/")}/{contentfilename}"
-                            blob = landing_bucket.blob(blob_destination)
+                            blob_destination = f"{landing_prefix.removesuffix('/')}/{contentfilename}"
                         else:
-                            blob_destination = f"{blob_path.removesuffix(".zip")}/{contentfilename}"
-                            blob = landing_bucket.blob(blob_destination)
-                        blob.upload_from_string(contentfile)
+                            blob_destination = f"{blob.name.removesuffix('.zip')}/{contentfilename}"
+                        with myzip.open(contentinfo) as contentfile:
+                            landing_bucket.blob(blob_destination).upload_from_file(
+                                contentfile, size=contentinfo.file_size, retry=DEFAULT_RETRY
+                            )
 
-        return blob_paths  # list of zip files extracted
+        # NOTE: we can't use batching because the payload must be less than 10MB (https://cloud.google.com/storage/docs/batch#overview)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # consume the results so that exceptions raised in the workers are propagated
+            list(executor.map(extract, blobs))
+
+        return [blob.name for blob in blobs]  # list of zip files extracted
 
     def convert_json_to_jsonl(self, bucket_name: str, prefix_filter: str) -> None:
         """Convert .json files to .jsonl in specified bucket that begin with the prefix.
@@ -254,23 +336,22 @@ class GoogleCloudStorage:
             The path prefix of the `.json` file paths to be converted.
         """
         bucket = self.client.get_bucket(bucket_name)
+        self._invalidate_subfolder_cache(bucket_name)
 
         landing_blobs = self.list_blobs_with_prefix(bucket_name, prefix_filter)
-        landing_blob_paths = [blob.name for blob in landing_blobs]
-        json_blobs = [p for p in landing_blob_paths if re.search(r"\.json$", p) is not None]
+        json_blobs = [blob for blob in landing_blobs if blob.name.endswith(".json")]
 
-        for json_blob in json_blobs:
-            blob = bucket.blob(json_blob)
+        for blob in json_blobs:
             blob_content = blob.download_as_string().decode("utf-8", "replace")
             data = json.loads(blob_content)
-            jsonl_blob = bucket.blob(json_blob + "l")
+            jsonl_blob = bucket.blob(blob.name + "l")
             if isinstance(data, dict):
-                jsonl_blob.upload_from_string(json.dumps(data))
+                jsonl_blob.upload_from_string(orjson.dumps(data), content_type="application/x-ndjson")
             elif isinstance(data, list):
-                content = ""
+                buffer = io.BytesIO()
                 for datum in data:
-                    content = content + json.dumps(datum) + "\n"
-                jsonl_blob.upload_from_string(content)
+                    buffer.write(orjson.dumps(datum, option=orjson.OPT_APPEND_NEWLINE))
+                jsonl_blob.upload_from_file(buffer, content_type="application/x-ndjson", rewind=True)
 
     def download_blob_as_string(self, bucket_name: str, blob_path: str) -> str:
         """
@@ -289,6 +370,29 @@ class GoogleCloudStorage:
         blob_content = blob.download_as_string().decode("utf-8", "replace")
         return blob_content
 
+    def download_many_as_bytes(self, blobs: list[Blob], workers: int = 4) -> Iterator[bytes]:
+        """
+        Download the content of every blob in a list concurrently, yielding each one in order as it completes.
+
+        At most `workers` downloads are in flight or waiting to be consumed at any time, so memory stays bounded by
+        a few files rather than the whole list.
+
+        Parameters
+        ----------
+        blobs : list[Blob]
+            The blobs that will be downloaded.
+        workers : int, optional
+            The maximum number of concurrent downloads.
+        """
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for blob in blobs:
+                if len(pending) >= workers:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(blob.download_as_bytes, retry=DEFAULT_RETRY))
+            while pending:
+                yield pending.popleft().result()
+
     def get_latest_seeds(self, bucket_name: str, prefix: str, file_name: str, datetime_format: str) -> Blob:
         """
         Locate the latest data seeds for a given file name suffix based on the provided datetime_format.
@@ -301,23 +405,16 @@ class GoogleCloudStorage:
             The path prefix to filter the search results.
         file_name : str
             The file name of the data seed that corresponds to the path suffix that you wish to match.
+            It may contain glob wildcards (e.g. `*`) to match several files.
         datetime_format : str
             The datetime string format to match in order to find the latest data seed entry.
         """
         subfolders = self.list_subfolders(bucket_name, prefix)
-        timestamps = []
-
-        for folder in subfolders:
-            t = folder.removeprefix(prefix).removesuffix("/")
-            timestamp = datetime.strptime(t, datetime_format)  # noqa: DTZ007
-            timestamps.append(timestamp)
-
-        latest_timestamp = max(timestamps)
-        latest_seed = f"{prefix}{latest_timestamp.strftime(datetime_format)}/"
-
-        blobs = self.list_blobs_with_prefix(bucket_name, latest_seed)
-        output = []
-        for blob in blobs:
-            if file_name in blob.name:
-                output.append(blob)
-        return output
+
+        def parse_timestamp(folder: str) -> datetime:
+            return datetime.strptime(folder.removeprefix(prefix).removesuffix("/"), datetime_format)  # noqa: DTZ007
+
+        # pick the latest folder itself rather than formatting its timestamp back into a path
+        latest_seed = max(subfolders, key=parse_timestamp)
+
+        return self.list_blobs_with_prefix(bucket_name, latest_seed, match_glob=f"{latest_seed}**{file_name}")